@@ -4,14 +4,19 @@ import re
 import sys
 import json
 import nltk
+import string
 import logging
-import openpyxl
 from nltk.sentiment.vader import SentimentIntensityAnalyzer
 from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
 from collections import Counter
+from functools import lru_cache
+from itertools import chain
 from datetime import datetime, timezone
+from pathlib import Path
 from dotenv import load_dotenv
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 import time
 
 # Completely suppress NLTK download messages and warnings
@@ -22,22 +27,38 @@ warnings.filterwarnings('ignore')
 import contextlib
 import io
 
-with contextlib.redirect_stdout(io.StringIO()):
-    with contextlib.redirect_stderr(io.StringIO()):
-        try:
-            nltk.data.find('tokenizers/punkt')
-        except LookupError:
-            nltk.download('punkt', quiet=True)
+# Prefer NLTK data bundled next to this script (see README) over user/system dirs
+_BUNDLED_NLTK_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nltk_data')
+if os.path.isdir(_BUNDLED_NLTK_DATA):
+    nltk.data.path.insert(0, _BUNDLED_NLTK_DATA)
 
-        try:
-            nltk.data.find('corpora/stopwords')
-        except LookupError:
-            nltk.download('stopwords', quiet=True)
+def setup_nltk(download_dir=None):
+    """Download any missing NLTK data, optionally into `download_dir`.
+    With `download_dir`, only that directory counts as having the data, so
+    copies in the user or system NLTK directories don't stop the download.
+    Returns False if a download failed."""
+    available = True
+    search_paths = None
+    if download_dir:
+        search_paths = [download_dir]
+        if download_dir not in nltk.data.path:
+            nltk.data.path.insert(0, download_dir)
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        with contextlib.redirect_stderr(io.StringIO()):
+            for resource, package in (('corpora/stopwords', 'stopwords'),
+                                      ('sentiment/vader_lexicon', 'vader_lexicon')):
+                try:
+                    nltk.data.find(resource, paths=search_paths)
+                except LookupError:
+                    available = nltk.download(package, download_dir=download_dir, quiet=True) and available
+    return available
 
-        try:
-            nltk.data.find('sentiment/vader_lexicon')
-        except LookupError:
-            nltk.download('vader_lexicon', quiet=True)
+def _check_nltk_data():
+    """Check for (and fetch) NLTK data unless the caller opted out with
+    REDDIT_PERSONA_SKIP_NLTK_CHECK=1, e.g. after running --setup once"""
+    if os.environ.get('REDDIT_PERSONA_SKIP_NLTK_CHECK') != '1':
+        setup_nltk()
 
 # Set console encoding to UTF-8
 if sys.stdout.encoding != 'utf-8':
@@ -46,16 +67,250 @@ if sys.stdout.encoding != 'utf-8':
 # Load environment variables from .env file
 load_dotenv()
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-    nltk.data.find('corpora/stopwords')
-    nltk.data.find('sentiment/vader_lexicon')
-except LookupError:
-    print("Downloading required NLTK data...")
-    nltk.download('punkt', quiet=True)
-    nltk.download('stopwords', quiet=True)
-    nltk.download('vader_lexicon', quiet=True)
+@lru_cache(maxsize=None)
+def _english_stopwords():
+    """English stopwords, loaded once and shared by every analyzer instance"""
+    return frozenset(stopwords.words('english'))
+
+# Text cleanup patterns
+_URL_RE = re.compile(r'http\S+|www\.\S+')
+_HTTP_URL_RE = re.compile(r'http\S+')
+_MD_LINK_RE = re.compile(r'\[.*?\]\(.*?\)')
+_NONWORD_RE = re.compile(r'[^\w\s]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Maps punctuation and digits to spaces for clean_text
+_PUNCT_TABLE = str.maketrans({c: ' ' for c in string.punctuation + string.digits})
+
+# Age mentions, e.g. "I'm 25 years old" or "born in 1990", in priority order so a
+# first-person statement beats an earlier "N years old" about someone else; each
+# pattern captures either an age or a birth year
+_AGE_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    # Matches "I'm X years old" or "I am X years old"
+    r'(?:i[\'\'\’]m|i am|age is|aged|turning)\s+(?P<age_stated>\d{1,2})\s*(?:years?\s*old|y\/o|yo|y\.o\.|\b)',
+    # Matches "age X" or "aged X"
+    r'(?:age|aged)\s+(?P<age_prefixed>\d{1,2})\s*(?:years?\s*old|y\/o|yo|y\.o\.|\b)',
+    # Matches "X years old" or "X yo"
+    r'(?P<age_suffixed>\d{1,2})\s*(?:years?\s*old|y\/o|yo|y\.o\.)(?:\b|\W|$)',
+    # Matches "born in 19XX" or "born in 20XX"
+    r'born (?:in|on|\w+)?\s*(?:the year )?(?:of )?(?P<birth_year>19\d{2}|20[01]\d)(?:\D|$)',
+    # Matches "turned X last year" or "when I was X"
+    r'(?:turned|when i was|since i was|since age|age)\s+(?P<age_past>\d{1,2})\b'
+)]
+
+# Phrases that introduce a location
+_LOCATION_INDICATORS = [
+    'i live in', 'i\'m from', 'i am from', 'based in', 'located in', 
+    'hometown', 'currently in', 'living in', 'reside in', 'based out of'
+]
+
+# List of common locations to match against
+_COMMON_LOCATIONS = [
+    # US States
+    'Alabama', 'Alaska', 'Arizona', 'Arkansas', 'California', 'Colorado', 'Connecticut', 'Delaware',
+    'Florida', 'Georgia', 'Hawaii', 'Idaho', 'Illinois', 'Indiana', 'Iowa', 'Kansas', 'Kentucky',
+    'Louisiana', 'Maine', 'Maryland', 'Massachusetts', 'Michigan', 'Minnesota', 'Mississippi', 'Missouri',
+    'Montana', 'Nebraska', 'Nevada', 'New Hampshire', 'New Jersey', 'New Mexico', 'New York',
+    'North Carolina', 'North Dakota', 'Ohio', 'Oklahoma', 'Oregon', 'Pennsylvania', 'Rhode Island',
+    'South Carolina', 'South Dakota', 'Tennessee', 'Texas', 'Utah', 'Vermont', 'Virginia', 'Washington',
+    'West Virginia', 'Wisconsin', 'Wyoming',
+    # Countries
+    'United States', 'Canada', 'United Kingdom', 'Australia', 'Germany', 'France', 'Japan', 'China',
+    'India', 'Brazil', 'Mexico', 'Italy', 'Spain', 'Russia', 'South Korea'
+]
+
+_COMMON_LOCATIONS_LOWER = frozenset(loc.lower() for loc in _COMMON_LOCATIONS)
+
+# Common location patterns (cities, states, countries)
+_LOCATION_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    # Matches "I live in [Location]" or "Based in [Location]" etc.
+    r'(?:{})\s+([A-Z][A-Za-z\s]{{2,}}(?:,\s*[A-Z][A-Za-z\s]+)*)'.format('|'.join(_LOCATION_INDICATORS)),
+    # Matches "in [City, State]" or "in [City, Country]"
+    r'in\s+([A-Z][A-Za-z\s]+(?:,\s*(?:[A-Z][a-z]+\s*)+)?)',
+    # Matches "from [Location]"
+    r'from\s+([A-Z][A-Za-z\s]+(?:,\s*[A-Za-z\s]+)*)',
+    # Matches common locations as standalone words
+    r'\b({})\b'.format('|'.join(_COMMON_LOCATIONS))
+)]
+
+# Capitalized place name, optionally followed by ", Region"
+_LOCATION_NAME_RE = re.compile(r'^[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*(?:,\s*[A-Z][a-z]+)?$')
+
+# Occupation and education mentions
+# Generic fallback: matches almost any "i ..." phrase, so a candidate from it is
+# only accepted when it names a known occupation
+_GENERIC_OCCUPATION_RE = re.compile(r'(?:i(?:\'?m| am| work)?\s+(?:as\s+)?)([a-z\s-]+(?:\s+at\s+[a-z\s-]+)?)', re.IGNORECASE)
+
+_OCCUPATION_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    # Work-related phrases
+    r'(?:i(?:\'?m| am|\'ve been)?\s+(?:working\s+)?(?:as|at|in))\s+([a-z\s-]+(?:\s+at\s+[a-z\s-]+)?)',
+    r'(?:my\s+(?:current\s+)?(?:job|profession|occupation|role|position|title)(?:\s+is|\:))\s+([a-z\s-]+)',
+    r'(?:i(?:\'?m| am| work)?\s+(?:a|an|the)?\s*)([a-z\s-]+(?:\s+by\s+[a-z\s-]+)?)(?:\s+by\s+profession|\s+by\s+trade|\s+here|\s+myself)',
+    # Education-related
+    r'(?:i(?:\'?m| am| study|\'m studying| study|major(?:ing)? in|majored in|pursuing(?: a degree in)?))\s+([a-z\s-]+(?:\s+at\s+[a-z\s-]+)?)',
+    r'(?:i(?:\'?m| am| was)?\s+an?\s+)([a-z\s-]+(?:\s+student\b|\s+at\b|\s+in\b|\s+studying\b))',
+    # Industry-specific
+    r'(?:i(?:\'?m| am| work)?\s+in\s+(?:the\s+)?)([a-z\s-]+(?:\s+industry|\s+field|\s+sector|\s+area))',
+    # Self-employed/Entrepreneur
+    r'(?:i(?:\'?m| am| run)?\s+(?:a|an|my|the)?\s*)([a-z\s-]+(?:\s+business|\s+company|\s+startup|\s+venture|\s+shop))',
+    r'(?:i(?:\'?m| am| own| operate)?\s+(?:a|an|my|the)?\s*)([a-z\s-]+(?:\s+store|\s+shop|\s+service))',
+    # Freelance/Contract work
+    r'(?:i(?:\'?m| am)?\s+(?:a|an)?\s*)([a-z\s-]+(?:\s+freelance\w*|\s+contractor|\s+consultant))',
+    # Retired/Unemployed
+    r'(i(?:\'?m| am)\s+(?:a\s+)?(?:retired|unemployed|between jobs|looking for work|job hunting|seeking employment))'
+)] + [_GENERIC_OCCUPATION_RE]
+
+# Common job titles and fields to validate against
+_COMMON_OCCUPATIONS = [
+    # Professional/White-collar
+    'engineer', 'developer', 'programmer', 'designer', 'analyst', 'manager', 'director', 'executive',
+    'consultant', 'architect', 'scientist', 'researcher', 'professor', 'teacher', 'instructor',
+    'lawyer', 'attorney', 'doctor', 'physician', 'nurse', 'therapist', 'counselor', 'accountant',
+    'marketer', 'specialist', 'strategist', 'planner', 'coordinator', 'administrator',
+    # Trades/Blue-collar
+    'technician', 'mechanic', 'electrician', 'plumber', 'carpenter', 'contractor', 'builder',
+    'chef', 'cook', 'baker', 'bartender', 'server', 'waiter', 'waitress', 'barista',
+    'driver', 'operator', 'laborer', 'factory worker', 'warehouse worker', 'delivery driver',
+    # Creative
+    'artist', 'writer', 'author', 'musician', 'actor', 'actress', 'performer', 'photographer',
+    'filmmaker', 'producer', 'editor', 'journalist', 'reporter', 'blogger', 'influencer',
+    # Service
+    'sales', 'retail', 'cashier', 'customer service', 'receptionist', 'assistant', 'secretary',
+    'hairdresser', 'stylist', 'esthetician', 'masseuse', 'trainer', 'coach', 'instructor',
+    # Other
+    'student', 'researcher', 'scientist', 'analyst', 'entrepreneur', 'business owner', 'freelancer',
+    'consultant', 'contractor', 'self-employed', 'retired', 'unemployed', 'homemaker', 'parent'
+]
+_COMMON_OCCUPATIONS_RE = re.compile('|'.join(map(re.escape, _COMMON_OCCUPATIONS)))
+
+# Phrases that indicate the user is a student
+_STUDENT_INDICATORS = [
+    'college student', 'university student', 'grad student', 'graduate student',
+    'high school student', 'student at', 'studying at', 'pursuing', 'majoring in'
+]
+_STUDENT_RE = re.compile('|'.join(map(re.escape, _STUDENT_INDICATORS)))
+
+# Cleanup and validation of extracted occupation phrases
+_LEADING_NONALPHA = string.punctuation + string.whitespace + string.digits
+_FILLER_WORDS_RE = re.compile(r'\b(?:a|an|the|my|at|in|for|with|and|or|but)\b')
+_JOB_TITLE_RE = re.compile(r'^[a-z]+(?:\s+[a-z]+){0,3}$')
+# Words that never appear in a job title: pronouns, contraction fragments left
+# by the punctuation cleanup ("i'm" -> "i m") and common filler
+_NON_TITLE_WORDS_RE = re.compile(
+    r'\b(?:i|me|my|you|your|we|us|our|he|she|they|it|this|that|these|those'
+    r'|m|s|t|re|ve|ll|d|so|was|is|be|been|just|really|very|lol|here|there)\b'
+)
+
+def _find_occupation(content):
+    """Return the first valid occupation mentioned in cleaned, lowercased content,
+    or None. Patterns are tried in priority order, so the generic fallback only
+    applies when none of the specific phrasings produce a usable title"""
+    for pattern in _OCCUPATION_PATTERNS:
+        for match in pattern.finditer(content):
+            occupation = match.group(1) if match.lastindex else match.group(0)
+            
+            # Clean up the extracted occupation
+            occupation = occupation.lstrip(_LEADING_NONALPHA)  # Remove leading non-letters
+            occupation = _FILLER_WORDS_RE.sub('', occupation)  # Remove common words
+            occupation = _WHITESPACE_RE.sub(' ', occupation).strip()  # Normalize whitespace
+            
+            # Skip if too short or contains invalid characters
+            if len(occupation) < 3 or len(occupation.split()) > 5:
+                continue
+                
+            # Accept it if a common occupation is mentioned, otherwise it has to
+            # look like a job title (never enough for the generic fallback)
+            if (_COMMON_OCCUPATIONS_RE.search(occupation) or
+                    (pattern is not _GENERIC_OCCUPATION_RE and
+                     _JOB_TITLE_RE.match(occupation) and not _NON_TITLE_WORDS_RE.search(occupation))):
+                return occupation.title()
+    return None
+
+# Career/professional subreddits and the occupation they suggest
+_SUBREDDIT_OCCUPATIONS = {
+    'programming': 'Software Developer',
+    'webdev': 'Web Developer',
+    'learnprogramming': 'Aspiring Programmer',
+    'cscareerquestions': 'Tech Professional',
+    'datascience': 'Data Scientist',
+    'engineering': 'Engineer',
+    'askengineers': 'Engineer',
+    'medicine': 'Medical Professional',
+    'nursing': 'Nurse',
+    'law': 'Legal Professional',
+    'lawyers': 'Lawyer',
+    'teachers': 'Teacher',
+    'marketing': 'Marketing Professional',
+    'sales': 'Sales Professional',
+    'entrepreneur': 'Entrepreneur',
+    'startups': 'Startup Founder',
+    'smallbusiness': 'Small Business Owner',
+    'freelance': 'Freelancer',
+    'graphic_design': 'Graphic Designer',
+    'photography': 'Photographer',
+    'filmmakers': 'Filmmaker',
+    'writing': 'Writer',
+    'art': 'Artist',
+    'music': 'Musician',
+    'chefs': 'Chef',
+    'talesfromyourserver': 'Restaurant Server',
+    'talesfromretail': 'Retail Worker',
+    'talesfromtechsupport': 'IT Support'
+}
+
+# Subreddits that hint at relationship status
+_FAMILY_SUBS = frozenset({
+    'marriage', 'relationships', 'relationship_advice', 'dating_advice',
+    'weddingplanning', 'weddings', 'divorce', 'singleparents', 'dating'
+})
+
+# Relationship status mentions, in priority order: explicit first-person statements
+# come before weak phrases like "broke up" that may be about someone else. Patterns
+# are written in lowercase and matched against lowercased text, so no IGNORECASE.
+_RELATIONSHIP_PATTERNS = [(re.compile(p), status) for p, status in (
+    # Married/Partnered
+    (r'(?:i(?:\'?m| am|\'ve been)?\s+(?:happily\s+)?(?:married|engaged|betrothed|wed(?:ded)?)(?:\s+to\s+\w+)?(?:\s+for\s+\w+)?\b)', 'married'),
+    (r'(?:my\s+(?:wife|husband|spouse|fianc[ée]e?)(?:\s+and\s+i)?\b)', 'married'),
+    (r'(?:we(?:\'?re| are)?\s+(?:married|engaged|together)(?:\s+for\s+\w+)?\b)', 'married'),
+
+    # In a relationship
+    (r'(?:i(?:\'?m| am|\'ve been)?\s+(?:in\s+a\s+relationship|dating|going\s+out|seeing\s+someone)(?:\s+with\s+\w+)?(?:\s+for\s+\w+)?\b)', 'in a relationship'),
+    (r'(?:my\s+(?:girlfriend|boyfriend|partner|s.o.|significant\s+other|better\s+half)(?:\s+and\s+i)?\b)', 'in a relationship'),
+    (r'(?:we(?:\'?re| are)?\s+together(?:\s+for\s+\w+)?\b)', 'in a relationship'),
+
+    # Single/Dating
+    (r'(?:i(?:\'?m| am)?\s+(?:single|unattached|not\s+seeing\s+anyone|not\s+dating(?:\s+anyone)?|not\s+in\s+a\s+relationship)\b)', 'single'),
+    (r'(?:i(?:\'?m| am)?\s+(?:dating\s+around|playing\s+the\s+field|happily\s+single))', 'single'),
+
+    # Complicated/Other
+    (r'(?:it\'s\s+complicated|complicated\s+relationship|on\s+and\s+off)', 'it\'s complicated'),
+    (r'(?:in\s+an?\s+open\s+relationship|open\s+marriage|ethically\s+non\-?monogamous)', 'in an open relationship'),
+    (r'(?:divorc(?:ed|ing)|separat(?:ed|ing)|split\s+up|broke\s+up)', 'divorced/separated'),
+    (r'(?:widow(?:ed)?|lost\s+my\s+(?:wife|husband|partner))', 'widowed')
+)]
+
+# Additional context patterns that might indicate relationship status
+_RELATIONSHIP_CONTEXT_PATTERNS = [(re.compile(p), status) for p, status in (
+    (r'(?:my\s+(?:wife|husband|spouse|fianc[ée]e?|girlfriend|boyfriend|partner|s.o.|significant\s+other))', 'in a relationship'),
+    (r'(?:our\s+(?:anniversary|wedding|marriage|relationship))', 'married'),
+    (r'(?:we\'ve\s+been\s+together\s+for)', 'in a relationship'),
+    (r'(?:my\s+ex(?:\-\w+)?\b)', 'single')
+)]
+
+# Keyword alternations for persona elements
+_MOTIVATION_RE = re.compile(r'\b(?:want to|hope to|aspire to|dream of|goal is)\b')
+_GOAL_RE = re.compile(r'goal|objective|aim|target')
+_BEHAVIOR_RE = re.compile(r'i always|i usually|i often')
+_FRUSTRATION_RE = re.compile(r'frustrat|annoy|bother|problem|issue')
+
+@lru_cache(maxsize=4096)
+def _clean_text(text, stop_words):
+    """Cached core of RedditPersonaAnalyzer.clean_text; repeated bodies hit the cache"""
+    # Remove URLs, special characters, and numbers
+    text = _URL_RE.sub('', text).lower().translate(_PUNCT_TABLE)
+    
+    # Tokenize and remove stopwords
+    return ' '.join(word for word in text.split() if len(word) > 2 and word not in stop_words)
 
 # Google Sheets API setup
 try:
@@ -78,8 +333,12 @@ class RedditPersonaAnalyzer:
         )
         
         # Initialize NLTK components
+        _check_nltk_data()
         self.sia = SentimentIntensityAnalyzer()
-        self.stop_words = set(stopwords.words('english'))
+        self.stop_words = _english_stopwords()
+        
+        # (username, persona_data) from the most recent successful analysis
+        self._last_persona = None
         
         # Initialize Google Sheets if available
         self.google_sheets_service = None
@@ -157,6 +416,14 @@ class RedditPersonaAnalyzer:
                 ["Total Posts", persona_data.get('total_posts', 0), ""],
             ])
             
+            # Convert rows to cell data so the sheet is filled in the create call itself
+            def to_cell(value):
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    return {'userEnteredValue': {'numberValue': value}}
+                return {'userEnteredValue': {'stringValue': str(value)}}
+            
+            row_data = [{'values': [to_cell(value) for value in row]} for row in values]
+            
             # Create a new spreadsheet if no ID provided
             try:
                 # Try to create a new spreadsheet
@@ -164,7 +431,11 @@ class RedditPersonaAnalyzer:
                 spreadsheet = {
                     'properties': {
                         'title': f'Reddit Persona - {username} - {datetime.now().strftime("%Y-%m-%d")}'
-                    }
+                    },
+                    'sheets': [{
+                        'properties': {'title': sheet_name},
+                        'data': [{'startRow': 0, 'startColumn': 0, 'rowData': row_data}]
+                    }]
                 }
                 spreadsheet = self.google_sheets_service.spreadsheets().create(
                     body=spreadsheet,
@@ -184,15 +455,6 @@ class RedditPersonaAnalyzer:
                 print("7. Wait a few minutes for changes to take effect")
                 return None
             
-            # Update the sheet
-            body = {'values': values}
-            result = self.google_sheets_service.spreadsheets().values().update(
-                spreadsheetId=spreadsheet_id,
-                range=f"{sheet_name}!A1",
-                valueInputOption='RAW',
-                body=body
-            ).execute()
-            
             return f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/edit"
             
         except Exception as e:
@@ -230,15 +492,7 @@ class RedditPersonaAnalyzer:
         try:
             if not text or not isinstance(text, str):
                 return ""
-                
-            # Remove URLs, special characters, and numbers
-            text = re.sub(r'http\S+|www\.\S+', '', text)
-            text = re.sub(r'[^\w\s]', ' ', text.lower())
-            
-            # Tokenize and remove stopwords
-            stop_words = set(stopwords.words('english'))
-            words = word_tokenize(text)
-            return ' '.join([word for word in words if word not in stop_words and len(word) > 2])
+            return _clean_text(text, self.stop_words)
         except Exception as e:
             print(f"\nError cleaning text: {e}")
             return ""
@@ -247,22 +501,32 @@ class RedditPersonaAnalyzer:
         """Analyze sentiment of a text"""
         return self.sia.polarity_scores(text)
     
+    def average_sentiment(self, texts):
+        """Analyze each text separately and average the scores"""
+        scores = [self.analyze_sentiment(text) for text in texts]
+        if not scores:
+            return self.analyze_sentiment("")
+        return {key: sum(score[key] for score in scores) / len(scores)
+                for key in ('neg', 'neu', 'pos', 'compound')}
+    
     def get_common_words(self, texts, n=10):
         """Get most common words from a list of texts"""
-        words = []
+        word_counts = Counter()
         for text in texts:
-            words.extend(text.split())
-        return Counter(words).most_common(n)
+            word_counts.update(text.split())
+        return word_counts.most_common(n)
     
-    def get_user_comments(self, username, limit=100):
-        """Fetch user's comments from Reddit"""
+    def get_user_comments(self, username, limit=100, redditor=None):
+        """Fetch user's comments from Reddit, reusing `redditor` if given"""
         try:
-            user = self.reddit.redditor(username)
+            user = redditor if redditor is not None else self.reddit.redditor(username)
             comments = []
             for comment in user.comments.new(limit=limit):
+                subreddit = comment.subreddit.display_name
                 comments.append({
                     'body': comment.body,
-                    'subreddit': comment.subreddit.display_name,
+                    'subreddit': subreddit,
+                    'subreddit_lc': subreddit.lower(),
                     'score': comment.score,
                     'created_utc': comment.created_utc,
                     'url': f"https://reddit.com{comment.permalink}"
@@ -272,16 +536,18 @@ class RedditPersonaAnalyzer:
             print(f"Error fetching comments: {e}")
             return []
 
-    def get_user_posts(self, username, limit=50):
-        """Fetch user's posts from Reddit"""
+    def get_user_posts(self, username, limit=50, redditor=None):
+        """Fetch user's posts from Reddit, reusing `redditor` if given"""
         try:
-            user = self.reddit.redditor(username)
+            user = redditor if redditor is not None else self.reddit.redditor(username)
             posts = []
             for submission in user.submissions.new(limit=limit):
+                subreddit = submission.subreddit.display_name
                 posts.append({
                     'title': submission.title,
                     'selftext': submission.selftext,
-                    'subreddit': submission.subreddit.display_name,
+                    'subreddit': subreddit,
+                    'subreddit_lc': subreddit.lower(),
                     'score': submission.score,
                     'created_utc': submission.created_utc,
                     'url': f"https://reddit.com{submission.permalink}",
@@ -303,17 +569,20 @@ class RedditPersonaAnalyzer:
         print(f"\nAnalyzing u/{username}...")
         
         try:
-            # Get user comments and posts
-            comments = self.get_user_comments(username, limit)
-            posts = self.get_user_posts(username, limit // 2)  # Fewer posts than comments
+            # Get user comments and posts (fewer posts than comments). They are fetched
+            # one after the other because a praw.Reddit instance is not thread-safe.
+            # PRAW sends `limit` as the page size and Reddit caps pages at 100, so each
+            # listing is a single request as long as limit <= 100.
+            redditor = self.reddit.redditor(username)
+            comments = self.get_user_comments(username, limit, redditor)
+            posts = self.get_user_posts(username, limit // 2, redditor)
             
-            # Combine all text for analysis
-            all_text = " ".join([comment['body'] for comment in comments] + 
-                              [post.get('title', '') + " " + post.get('selftext', '') 
-                               for post in posts if 'title' in post])
-            
-            # Analyze sentiment
-            avg_sentiment = self.analyze_sentiment(all_text)
+            # Analyze sentiment per comment/post so a single long or emoji-heavy
+            # item can't blow up VADER's runtime on one giant string
+            texts = [comment['body'] for comment in comments] + \
+                    [post.get('title', '') + " " + post.get('selftext', '')
+                     for post in posts if 'title' in post]
+            avg_sentiment = self.average_sentiment(texts)
             
             # Generate and print persona
             print("\nGenerating persona summary...")
@@ -364,7 +633,8 @@ class RedditPersonaAnalyzer:
             # Export to Google Sheets if requested
             if export_to_sheets and hasattr(self, 'google_sheets_service') and self.google_sheets_service:
                 self.export_to_google_sheets(username, persona_data)
-                
+            
+            self._last_persona = (username, persona_data)
             return persona_data
             
         except Exception as e:
@@ -373,74 +643,73 @@ class RedditPersonaAnalyzer:
                 print(f"Response: {e.response.text}")
             return None
             
-    def extract_motivations(self, comments, posts):
-        """Extract user motivations from comments and posts"""
+    def get_last_persona(self, username):
+        """Return the persona data from the most recent analysis if it was of `username`, else None"""
+        if self._last_persona and self._last_persona[0] == username:
+            return self._last_persona[1]
+        return None
+        
+    def extract_persona_elements(self, comments, posts):
+        """Extract motivations, goals, behaviors and frustrations in a single pass"""
         motivations = []
+        behaviors = []
+        frustrations = []
         for comment in comments:
             text = comment['body'].lower()
-            if any(word in text for word in ['want to', 'hope to', 'aspire to', 'dream of', 'goal is']):
-                motivations.append((
-                    "Wants to " + text.split('want to')[-1][:100] + "...",
-                    f"Comment in r/{comment['subreddit']}"
-                ))
-        return motivations or [("No explicit motivations mentioned recently", "N/A")]
-
-    def extract_goals(self, comments, posts):
-        """Extract user goals from comments and posts"""
+            source = f"Comment in r/{comment['subreddit']}"
+            match = _MOTIVATION_RE.search(text)
+            if match:
+                motivations.append(("Wants to " + text[match.end():match.end() + 100] + "...", source))
+            if _BEHAVIOR_RE.search(text):
+                behaviors.append(("Habit: " + text[:150] + "...", source))
+            if _FRUSTRATION_RE.search(text):
+                frustrations.append(("Frustrated by: " + text[:150] + "...", source))
+        
         goals = []
         for post in posts:
             text = (post.get('title', '') + ' ' + post.get('selftext', '')).lower()
-            if any(word in text for word in ['goal', 'objective', 'aim', 'target']):
+            match = _GOAL_RE.search(text)
+            if match:
                 goals.append((
-                    "Aims to " + text.split('goal')[-1][:100] + "...",
+                    "Aims to " + text[match.end():match.end() + 100] + "...",
                     f"Post in r/{post['subreddit']}"
                 ))
-        return goals or [("Not explicitly mentioned in recent activity", "N/A")]
-
-    def extract_behaviors(self, comments, posts):
-        """Extract user behaviors from comments and posts"""
-        behaviors = []
-        for comment in comments:
-            text = comment['body'].lower()
-            if 'i always' in text or 'i usually' in text or 'i often' in text:
-                behaviors.append((
-                    "Habit: " + text[:150] + "...",
-                    f"Comment in r/{comment['subreddit']}"
-                ))
-        return behaviors or [("Patterns not clearly identifiable from recent activity", "N/A")]
-
-    def extract_frustrations(self, comments, posts):
-        """Extract user frustrations from comments and posts"""
-        frustrations = []
-        for comment in comments:
-            text = comment['body'].lower()
-            if any(word in text for word in ['frustrat', 'annoy', 'bother', 'problem', 'issue']):
-                frustrations.append((
-                    "Frustrated by: " + text[:150] + "...",
-                    f"Comment in r/{comment['subreddit']}"
-                ))
-        return frustrations or [("No explicit frustrations mentioned recently", "N/A")]
+        
+        return {
+            'motivations': motivations or [("No explicit motivations mentioned recently", "N/A")],
+            'goals': goals or [("Not explicitly mentioned in recent activity", "N/A")],
+            'behaviors': behaviors or [("Patterns not clearly identifiable from recent activity", "N/A")],
+            'frustrations': frustrations or [("No explicit frustrations mentioned recently", "N/A")]
+        }
 
     def determine_archetype(self, comments, posts, personality_trait):
         """Determine user archetype based on activity"""
         if not comments and not posts:
             return "Observer"
         
-        # Count different types of interactions
-        question_count = sum(1 for c in comments if '?' in c['body'])
-        answer_count = sum(1 for c in comments if '?' not in c['body'] and len(c['body'].split()) > 10)
+        # Count different types of interactions in a single pass
+        question_count = answer_count = 0
+        subreddits = set()
+        for c in comments:
+            body = c['body']
+            subreddits.add(c['subreddit'])
+            if '?' in body:
+                question_count += 1
+            elif len(body.split()) > 10:
+                answer_count += 1
         
         if question_count > answer_count * 2:
             return "The Inquirer"
         elif answer_count > question_count * 2:
             return "The Helper"
-        elif len(set(c['subreddit'] for c in comments)) > 5:
+        elif len(subreddits) > 5:
             return "The Explorer"
         else:
             return "The Engaged Member"
 
     def extract_personal_info(self, text, comments, posts):
-        """Extract personal information from user's activity"""
+        """Extract personal information from user's activity.
+        `text` is the combined text of all comments and posts."""
         info = {
             'age': 'Not specified',
             'occupation': 'Not specified',
@@ -452,103 +721,39 @@ class RedditPersonaAnalyzer:
         all_content = [text] + [c['body'] for c in comments] + \
                      [p.get('title', '') + ' ' + p.get('selftext', '') for p in posts]
         
-        # Look for age mentions with specific patterns
-        age_patterns = [
-            # Matches "I'm X years old" or "I am X years old"
-            r'(?:i[\'\'\’]m|i am|age is|aged|turning)\s+(\d{1,2})\s*(?:years?\s*old|y\/o|yo|y\.o\.|\b)',
-            # Matches "age X" or "aged X"
-            r'(?:age|aged)\s+(\d{1,2})\s*(?:years?\s*old|y\/o|yo|y\.o\.|\b)',
-            # Matches "X years old" or "X yo"
-            r'(\d{1,2})\s*(?:years?\s*old|y\/o|yo|y\.o\.)(?:\b|\W|$)',
-            # Matches "born in 19XX" or "born in 20XX"
-            r'born (?:in|on|\w+)?\s*(?:the year )?(?:of )?(19\d{2}|20[01]\d)(?:\D|$)',
-            # Matches "turned X last year" or "when I was X"
-            r'(?:turned|when i was|since i was|since age|age)\s+(\d{1,2})\b'
-        ]
+        # Subreddits the user comments in, used by the occupation and relationship fallbacks
+        subreddit_counter = Counter(c['subreddit_lc'] for c in comments)
         
-        current_year = datetime.now().year
+        # Remove markdown links and URLs once; every pass below reuses the result
+        cleaned_content = [_HTTP_URL_RE.sub('', _MD_LINK_RE.sub('', content)) for content in all_content]
         
-        for content in all_content:
-            # Clean the content (remove markdown, URLs, etc.)
-            clean_content = re.sub(r'\[.*?\]\(.*?\)', '', content)  # Remove markdown links
-            clean_content = re.sub(r'http\S+', '', clean_content)  # Remove URLs
-            
-            # Check for age patterns
-            for pattern in age_patterns:
-                match = re.search(pattern, clean_content, re.IGNORECASE)
-                if match:
-                    age = None
-                    # Handle different group patterns
-                    if len(match.groups()) > 1:
-                        age = next((g for g in match.groups() if g and g.isdigit() and 13 <= int(g) <= 100), None)
-                    elif match.group(1):
-                        if match.group(1).isdigit() and 13 <= int(match.group(1)) <= 100:
-                            age = match.group(1)
-                    
-                    # Special handling for birth years
-                    if not age and len(match.groups()) > 0 and match.group(1):
-                        year = match.group(1)
-                        if year.isdigit() and len(year) == 4 and 1900 <= int(year) <= current_year:
-                            age = str(current_year - int(year))
-                    
-                    if age and 13 <= int(age) <= 100:  # Reasonable age range
-                        info['age'] = f"{age} years old"
-                        # Try to find a more specific age if available
-                        if 'years old' not in clean_content.lower() and int(age) < 30:
-                            # If age is approximate, try to find more specific mentions
-                            specific_age = re.search(rf'{age}\s*(?:years?\s*old|y\/o|yo|y\.o\.)', clean_content, re.IGNORECASE)
-                            if specific_age:
-                                info['age'] = f"{age} years old"
-                        break
+        # The combined text already covers every item, so the age, student and
+        # relationship checks scan it once rather than re-scanning each item
+        clean_text = cleaned_content[0]
+        
+        # Check for age patterns; the first plausible mention of the
+        # highest-priority pattern wins
+        current_year = datetime.now().year
+        for pattern in _AGE_PATTERNS:
+            for match in pattern.finditer(clean_text):
+                age = int(match.group(match.lastgroup))
+                if match.lastgroup == 'birth_year':
+                    age = current_year - age
+                if 13 <= age <= 100:  # Reasonable age range
+                    info['age'] = f"{age} years old"
+                    break
             
             if info['age'] != 'Not specified':
                 break
         
-        # Look for location mentions with more specific patterns
-        location_indicators = [
-            'i live in', 'i\'m from', 'i am from', 'based in', 'located in', 
-            'hometown', 'currently in', 'living in', 'reside in', 'based out of'
-        ]
-        
-        # List of common locations to match against
-        common_locations = [
-            # US States
-            'Alabama', 'Alaska', 'Arizona', 'Arkansas', 'California', 'Colorado', 'Connecticut', 'Delaware',
-            'Florida', 'Georgia', 'Hawaii', 'Idaho', 'Illinois', 'Indiana', 'Iowa', 'Kansas', 'Kentucky',
-            'Louisiana', 'Maine', 'Maryland', 'Massachusetts', 'Michigan', 'Minnesota', 'Mississippi', 'Missouri',
-            'Montana', 'Nebraska', 'Nevada', 'New Hampshire', 'New Jersey', 'New Mexico', 'New York',
-            'North Carolina', 'North Dakota', 'Ohio', 'Oklahoma', 'Oregon', 'Pennsylvania', 'Rhode Island',
-            'South Carolina', 'South Dakota', 'Tennessee', 'Texas', 'Utah', 'Vermont', 'Virginia', 'Washington',
-            'West Virginia', 'Wisconsin', 'Wyoming',
-            # Countries
-            'United States', 'Canada', 'United Kingdom', 'Australia', 'Germany', 'France', 'Japan', 'China',
-            'India', 'Brazil', 'Mexico', 'Italy', 'Spain', 'Russia', 'South Korea'
-        ]
-        
-        # Common location patterns (cities, states, countries)
-        location_patterns = [
-            # Matches "I live in [Location]" or "Based in [Location]" etc.
-            r'(?:{})\s+([A-Z][A-Za-z\s]{{2,}}(?:,\s*[A-Z][A-Za-z\s]+)*)'.format('|'.join(location_indicators)),
-            # Matches "in [City, State]" or "in [City, Country]"
-            r'in\s+([A-Z][A-Za-z\s]+(?:,\s*(?:[A-Z][a-z]+\s*)+)?)',
-            # Matches "from [Location]"
-            r'from\s+([A-Z][A-Za-z\s]+(?:,\s*[A-Za-z\s]+)*)',
-            # Matches common locations as standalone words
-            r'\b({})\b'.format('|'.join(common_locations))
-        ]
-        
         # Check all content for location mentions
-        for content in all_content:
+        for content, clean_content in zip(all_content, cleaned_content):
             # Skip very short content to avoid false positives
             if len(content) < 30:  # Increased minimum length
                 continue
                 
-            # Clean the content (remove markdown, URLs, etc.)
-            clean_content = re.sub(r'\[.*?\]\(.*?\)', '', content)  # Remove markdown links
-            clean_content = re.sub(r'http\S+', '', clean_content)  # Remove URLs
-            
-            for pattern in location_patterns:
-                matches = re.finditer(pattern, clean_content, re.IGNORECASE)
+            for pattern in _LOCATION_PATTERNS:
+                matches = pattern.finditer(clean_content)
                 for match in matches:
                     location = match.group(1).strip() if match.lastindex else match.group(0).strip()
                     
@@ -564,8 +769,8 @@ class RedditPersonaAnalyzer:
                         continue
                         
                     # If it's a common location or matches a specific pattern
-                    if (any(loc.lower() == location.lower() for loc in common_locations) or
-                        re.match(r'^[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*(?:,\s*[A-Z][a-z]+)?$', location)):
+                    if (location.lower() in _COMMON_LOCATIONS_LOWER or
+                        _LOCATION_NAME_RE.match(location)):
                         info['location'] = location
                         break
                         
@@ -575,224 +780,45 @@ class RedditPersonaAnalyzer:
             if info['location'] != 'Not specified':
                 break
         
-        # Enhanced occupation extraction
-        occupation_indicators = [
-            # Work-related phrases
-            r'(?:i(?:\'?m| am|\'ve been)?\s+(?:working\s+)?(?:as|at|in))\s+([a-z\s-]+(?:\s+at\s+[a-z\s-]+)?)',
-            r'(?:my\s+(?:current\s+)?(?:job|profession|occupation|role|position|title)(?:\s+is|\:))\s+([a-z\s-]+)',
-            r'(?:i(?:\'?m| am| work)?\s+(?:a|an|the)?\s*)([a-z\s-]+(?:\s+by\s+[a-z\s-]+)?)(?:\s+by\s+profession|\s+by\s+trade|\s+here|\s+myself)',
-            # Education-related
-            r'(?:i(?:\'?m| am| study|\'m studying| study|major(?:ing)? in|majored in|pursuing(?: a degree in)?))\s+([a-z\s-]+(?:\s+at\s+[a-z\s-]+)?)',
-            r'(?:i(?:\'?m| am| was)?\s+an?\s+)([a-z\s-]+(?:\s+student\b|\s+at\b|\s+in\b|\s+studying\b))',
-            # Industry-specific
-            r'(?:i(?:\'?m| am| work)?\s+in\s+(?:the\s+)?)([a-z\s-]+(?:\s+industry|\s+field|\s+sector|\s+area))',
-            # Self-employed/Entrepreneur
-            r'(?:i(?:\'?m| am| run)?\s+(?:a|an|my|the)?\s*)([a-z\s-]+(?:\s+business|\s+company|\s+startup|\s+venture|\s+shop))',
-            r'(?:i(?:\'?m| am| own| operate)?\s+(?:a|an|my|the)?\s*)([a-z\s-]+(?:\s+store|\s+shop|\s+service))',
-            # Freelance/Contract work
-            r'(?:i(?:\'?m| am)?\s+(?:a|an)?\s*)([a-z\s-]+(?:\s+freelance\w*|\s+contractor|\s+consultant))',
-            # Retired/Unemployed
-            r'(i(?:\'?m| am)\s+(?:a\s+)?(?:retired|unemployed|between jobs|looking for work|job hunting|seeking employment))',
-            # Generic fallback
-            r'(?:i(?:\'?m| am| work)?\s+(?:as\s+)?)([a-z\s-]+(?:\s+at\s+[a-z\s-]+)?)'
-        ]
-        
-        # Common job titles and fields to validate against
-        common_occupations = [
-            # Professional/White-collar
-            'engineer', 'developer', 'programmer', 'designer', 'analyst', 'manager', 'director', 'executive',
-            'consultant', 'architect', 'scientist', 'researcher', 'professor', 'teacher', 'instructor',
-            'lawyer', 'attorney', 'doctor', 'physician', 'nurse', 'therapist', 'counselor', 'accountant',
-            'marketer', 'specialist', 'strategist', 'planner', 'coordinator', 'administrator',
-            # Trades/Blue-collar
-            'technician', 'mechanic', 'electrician', 'plumber', 'carpenter', 'contractor', 'builder',
-            'chef', 'cook', 'baker', 'bartender', 'server', 'waiter', 'waitress', 'barista',
-            'driver', 'operator', 'laborer', 'factory worker', 'warehouse worker', 'delivery driver',
-            # Creative
-            'artist', 'writer', 'author', 'musician', 'actor', 'actress', 'performer', 'photographer',
-            'filmmaker', 'producer', 'editor', 'journalist', 'reporter', 'blogger', 'influencer',
-            # Service
-            'sales', 'retail', 'cashier', 'customer service', 'receptionist', 'assistant', 'secretary',
-            'hairdresser', 'stylist', 'esthetician', 'masseuse', 'trainer', 'coach', 'instructor',
-            # Other
-            'student', 'researcher', 'scientist', 'analyst', 'entrepreneur', 'business owner', 'freelancer',
-            'consultant', 'contractor', 'self-employed', 'retired', 'unemployed', 'homemaker', 'parent'
-        ]
-        
         # Check all content for occupation mentions
-        for content in all_content:
+        for content, clean_content in zip(all_content, cleaned_content):
             # Skip very short content to avoid false positives
             if len(content) < 30:
                 continue
                 
-            # Clean the content (remove markdown, URLs, etc.)
-            clean_content = re.sub(r'\[.*?\]\(.*?\)', '', content)  # Remove markdown links
-            clean_content = re.sub(r'http\S+', '', clean_content)  # Remove URLs
-            clean_content = re.sub(r'[^\w\s]', ' ', clean_content)  # Remove special chars
-            clean_content = re.sub(r'\s+', ' ', clean_content).strip().lower()  # Normalize whitespace
+            # Further clean the content for phrase matching
+            clean_content = _NONWORD_RE.sub(' ', clean_content)  # Remove special chars
+            clean_content = _WHITESPACE_RE.sub(' ', clean_content).strip().lower()  # Normalize whitespace
             
             # Check for occupation patterns
-            for pattern in occupation_indicators:
-                matches = re.finditer(pattern, clean_content, re.IGNORECASE)
-                for match in matches:
-                    occupation = match.group(1).strip() if match.lastindex else match.group(0).strip()
-                    
-                    # Clean up the extracted occupation
-                    occupation = re.sub(r'^[^a-z]+', '', occupation)  # Remove leading non-letters
-                    occupation = re.sub(r'\b(?:a|an|the|my|at|in|for|with|and|or|but)\b', '', occupation)  # Remove common words
-                    occupation = re.sub(r'\s+', ' ', occupation).strip()  # Normalize whitespace
-                    
-                    # Skip if too short or contains invalid characters
-                    if len(occupation) < 3 or len(occupation.split()) > 5:
-                        continue
-                        
-                    # Check if any common occupation is mentioned
-                    if any(occ in occupation for occ in common_occupations):
-                        info['occupation'] = occupation.title()
-                        break
-                        
-                    # Additional validation for job titles
-                    if (re.match(r'^[a-z]+(?:\s+[a-z]+){0,3}$', occupation) and 
-                        not any(word in occupation for word in ['i', 'me', 'my', 'you', 'your', 'we', 'us', 'our'])):
-                        info['occupation'] = occupation.title()
-                        break
-                
-                if info['occupation'] != 'Not specified':
-                    break
-            
-            if info['occupation'] != 'Not specified':
+            occupation = _find_occupation(clean_content)
+            if occupation:
+                info['occupation'] = occupation
                 break
                 
-        # If no occupation found, try to infer from subreddits
+        # If no occupation found, infer it from the most active professional subreddit
         if info['occupation'] == 'Not specified' and comments:
-            # Get top subreddits
-            subreddits = [c['subreddit'].lower() for c in comments]
-            subreddit_counter = Counter(subreddits)
-            
-            # Check if user is active in career/professional subreddits
-            professional_subs = {
-                'programming', 'webdev', 'learnprogramming', 'cscareerquestions', 'datascience',
-                'engineering', 'askengineers', 'medicine', 'nursing', 'law', 'lawyers', 'teachers',
-                'marketing', 'sales', 'entrepreneur', 'startups', 'smallbusiness', 'freelance',
-                'graphic_design', 'photography', 'filmmakers', 'writing', 'art', 'music', 'chefs',
-                'talesfromyourserver', 'talesfromretail', 'talesfromtechsupport'
-            }
-            
-            # Find matching professional subreddits
-            user_professional_subs = [sub for sub in subreddit_counter if sub in professional_subs]
-            if user_professional_subs:
-                # Get the most active professional subreddit
-                most_active = max(user_professional_subs, key=lambda x: subreddit_counter[x])
-                
-                # Map subreddits to occupations
-                sub_to_occupation = {
-                    'programming': 'Software Developer',
-                    'webdev': 'Web Developer',
-                    'learnprogramming': 'Aspiring Programmer',
-                    'cscareerquestions': 'Tech Professional',
-                    'datascience': 'Data Scientist',
-                    'engineering': 'Engineer',
-                    'askengineers': 'Engineer',
-                    'medicine': 'Medical Professional',
-                    'nursing': 'Nurse',
-                    'law': 'Legal Professional',
-                    'lawyers': 'Lawyer',
-                    'teachers': 'Teacher',
-                    'marketing': 'Marketing Professional',
-                    'sales': 'Sales Professional',
-                    'entrepreneur': 'Entrepreneur',
-                    'startups': 'Startup Founder',
-                    'smallbusiness': 'Small Business Owner',
-                    'freelance': 'Freelancer',
-                    'graphic_design': 'Graphic Designer',
-                    'photography': 'Photographer',
-                    'filmmakers': 'Filmmaker',
-                    'writing': 'Writer',
-                    'art': 'Artist',
-                    'music': 'Musician',
-                    'chefs': 'Chef',
-                    'talesfromyourserver': 'Restaurant Server',
-                    'talesfromretail': 'Retail Worker',
-                    'talesfromtechsupport': 'IT Support'
-                }
-                
-                info['occupation'] = sub_to_occupation.get(most_active, 'Not specified')
-        
-        # If still no occupation found, check for student status
-        if info['occupation'] == 'Not specified':
-            student_indicators = [
-                'college student', 'university student', 'grad student', 'graduate student',
-                'high school student', 'student at', 'studying at', 'pursuing', 'majoring in'
-            ]
-            
-            for content in all_content:
-                if any(indicator in content.lower() for indicator in student_indicators):
-                    info['occupation'] = 'Student'
+            for sub, _ in subreddit_counter.most_common():
+                if sub in _SUBREDDIT_OCCUPATIONS:
+                    info['occupation'] = _SUBREDDIT_OCCUPATIONS[sub]
                     break
         
-        # Enhanced relationship status detection
-        relationship_patterns = [
-            # Married/Partnered
-            (r'(?:i(?:\'?m| am|\'ve been)?\s+(?:happily\s+)?(?:married|engaged|betrothed|wed(?:ded)?)(?:\s+to\s+\w+)?(?:\s+for\s+\w+)?\b)', 'married'),
-            (r'(?:my\s+(?:wife|husband|spouse|fianc[ée]e?)(?:\s+and\s+i)?\b)', 'married'),
-            (r'(?:we(?:\'?re| are)?\s+(?:married|engaged|together)(?:\s+for\s+\w+)?\b)', 'married'),
-            
-            # In a relationship
-            (r'(?:i(?:\'?m| am|\'ve been)?\s+(?:in\s+a\s+relationship|dating|going\s+out|seeing\s+someone)(?:\s+with\s+\w+)?(?:\s+for\s+\w+)?\b)', 'in a relationship'),
-            (r'(?:my\s+(?:girlfriend|boyfriend|partner|s.o.|significant\s+other|better\s+half)(?:\s+and\s+i)?\b)', 'in a relationship'),
-            (r'(?:we(?:\'?re| are)?\s+together(?:\s+for\s+\w+)?\b)', 'in a relationship'),
-            
-            # Single/Dating
-            (r'(?:i(?:\'?m| am)?\s+(?:single|unattached|not\s+seeing\s+anyone|not\s+dating(?:\s+anyone)?|not\s+in\s+a\s+relationship)\b)', 'single'),
-            (r'(?:i(?:\'?m| am)?\s+(?:dating\s+around|playing\s+the\s+field|happily\s+single))', 'single'),
-            
-            # Complicated/Other
-            (r'(?:it\'s\s+complicated|complicated\s+relationship|on\s+and\s+off)', 'it\'s complicated'),
-            (r'(?:in\s+an?\s+open\s+relationship|open\s+marriage|ethically\s+non\-?monogamous)', 'in an open relationship'),
-            (r'(?:divorc(?:ed|ing)|separat(?:ed|ing)|split\s+up|broke\s+up)', 'divorced/separated'),
-            (r'(?:widow(?:ed)?|lost\s+my\s+(?:wife|husband|partner))', 'widowed')
-        ]
-        
-        # Additional context patterns that might indicate relationship status
-        context_patterns = [
-            (r'(?:my\s+(?:wife|husband|spouse|fianc[ée]e?|girlfriend|boyfriend|partner|s.o.|significant\s+other))', 'in a relationship'),
-            (r'(?:our\s+(?:anniversary|wedding|marriage|relationship))', 'married'),
-            (r'(?:we\'ve\s+been\s+together\s+for)', 'in a relationship'),
-            (r'(?:my\s+ex(?:\-\w+)?\b)', 'single')
-        ]
+        # If still no occupation found, check for student status
+        if info['occupation'] == 'Not specified' and _STUDENT_RE.search(text.lower()):
+            info['occupation'] = 'Student'
         
-        # Check all content for relationship status mentions
-        for content in all_content:
-            # Clean the content
-            clean_content = re.sub(r'\[.*?\]\(.*?\)', '', content)  # Remove markdown links
-            clean_content = re.sub(r'http\S+', '', clean_content)  # Remove URLs
-            clean_content = clean_content.lower()
-            
-            # Check direct relationship patterns
-            for pattern, status in relationship_patterns:
-                if re.search(pattern, clean_content, re.IGNORECASE):
-                    info['marriage_status'] = status
-                    break
-            
-            # If no direct match, check contextual patterns
-            if info['marriage_status'] == 'Not specified':
-                for pattern, status in context_patterns:
-                    if re.search(pattern, clean_content, re.IGNORECASE):
-                        info['marriage_status'] = status
-                        break
-            
-            if info['marriage_status'] != 'Not specified':
+        # Check for relationship status mentions, direct patterns first; the
+        # highest-priority pattern that matches anywhere wins
+        clean_text_lower = clean_text.lower()
+        for pattern, status in chain(_RELATIONSHIP_PATTERNS, _RELATIONSHIP_CONTEXT_PATTERNS):
+            if pattern.search(clean_text_lower):
+                info['marriage_status'] = status
                 break
-                
+        
         # If still not specified, check for family-related subreddits
         if info['marriage_status'] == 'Not specified' and comments:
-            family_subs = {
-                'marriage', 'relationships', 'relationship_advice', 'dating_advice',
-                'weddingplanning', 'weddings', 'divorce', 'singleparents', 'dating'
-            }
-            
-            user_subs = {c['subreddit'].lower() for c in comments}
-            if user_subs & family_subs:
+            user_subs = subreddit_counter.keys()
+            if user_subs & _FAMILY_SUBS:
                 if 'divorce' in user_subs:
                     info['marriage_status'] = 'divorced/separated'
                 elif 'singleparents' in user_subs:
@@ -816,18 +842,20 @@ class RedditPersonaAnalyzer:
     def generate_persona_summary(self, username, comments, posts, avg_sentiment, export_to_sheets=False):
         """Generate a detailed user persona with citations and optional Google Sheets export"""
         # Combine all text for analysis
-        all_text = " ".join([comment['body'] for comment in comments] + 
-                          [post.get('title', '') + " " + post.get('selftext', '') 
-                           for post in posts if 'title' in post])
+        all_text = " ".join(chain(
+            (comment['body'] for comment in comments),
+            (f"{post['title']} {post.get('selftext', '')}" for post in posts if 'title' in post)
+        ))
         
-        # Extract personal information
-        personal_info = self.extract_personal_info(all_text.lower(), comments, posts)
+        # Extract personal information (each check lowercases only what it needs)
+        personal_info = self.extract_personal_info(all_text, comments, posts)
         
         # Get persona elements
-        motivations = self.extract_motivations(comments, posts)
-        goals = self.extract_goals(comments, posts)
-        behaviors = self.extract_behaviors(comments, posts)
-        frustrations = self.extract_frustrations(comments, posts)
+        elements = self.extract_persona_elements(comments, posts)
+        motivations = elements['motivations']
+        goals = elements['goals']
+        behaviors = elements['behaviors']
+        frustrations = elements['frustrations']
         
         # Determine personality traits using the compound score from sentiment analysis
         compound_score = avg_sentiment.get('compound', 0)  # Default to neutral if compound score not found
@@ -862,70 +890,80 @@ class RedditPersonaAnalyzer:
             'total_posts': total_posts
         }
         
-        # Print the detailed persona with enhanced formatting
-        self.safe_print("\n" + "✨" + "="*78 + "✨")
-        self.safe_print(f"🔍  REDDIT PERSONA ANALYSIS: u/{username}".center(80))
-        self.safe_print("✨" + "="*78 + "✨\n")
+        # Build the detailed persona with enhanced formatting; it is written
+        # out in one go below rather than printed line by line
+        lines = []
+        lines.append("\n" + "✨" + "="*78 + "✨")
+        lines.append(f"🔍  REDDIT PERSONA ANALYSIS: u/{username}".center(80))
+        lines.append("✨" + "="*78 + "✨\n")
         
         # Basic Information with emojis and better formatting
-        self.safe_print("\n\U0001f4cb " + "BASIC INFORMATION".ljust(75, '\u2500'))
-        self.safe_print(f"   👤 Username: u/{username}")
-        self.safe_print(f"   🎂 Age: {personal_info['age']}")
-        self.safe_print(f"   📍 Location: {personal_info['location']}")
-        self.safe_print(f"   💼 Occupation: {personal_info['occupation']}")
-        self.safe_print(f"   💑 Relationship Status: {personal_info['marriage_status']}")
+        lines.append("\n\U0001f4cb " + "BASIC INFORMATION".ljust(75, '\u2500'))
+        lines.append(f"   👤 Username: u/{username}")
+        lines.append(f"   🎂 Age: {personal_info['age']}")
+        lines.append(f"   📍 Location: {personal_info['location']}")
+        lines.append(f"   💼 Occupation: {personal_info['occupation']}")
+        lines.append(f"   💑 Relationship Status: {personal_info['marriage_status']}")
         
         # Personality & Archetype with visual indicators
-        self.safe_print("\n\U0001f9e0 " + "PERSONALITY & ARCHETYPE".ljust(75, '\u2500'))
-        self.safe_print(f"   🧩 Archetype: {archetype}")
-        self.safe_print(f"   🧠 Personality: {personality}")
+        lines.append("\n\U0001f9e0 " + "PERSONALITY & ARCHETYPE".ljust(75, '\u2500'))
+        lines.append(f"   🧩 Archetype: {archetype}")
+        lines.append(f"   🧠 Personality: {personality}")
         sentiment_emoji = '😊' if compound_score > 0.1 else '😐' if compound_score > -0.1 else '😟'
-        self.safe_print(f"   {sentiment_emoji} Overall Sentiment: {abs(compound_score)*100:.1f}% {'positive' if compound_score > 0 else 'negative' if compound_score < 0 else 'neutral'}")
+        lines.append(f"   {sentiment_emoji} Overall Sentiment: {abs(compound_score)*100:.1f}% {'positive' if compound_score > 0 else 'negative' if compound_score < 0 else 'neutral'}")
         
         # Motivations with emojis and better formatting
-        self.safe_print("\n\U0001f4a1 " + "MOTIVATIONS".ljust(75, '\u2500'))
+        lines.append("\n\U0001f4a1 " + "MOTIVATIONS".ljust(75, '\u2500'))
         for i, (motivation, source) in enumerate(motivations[:3], 1):
-            self.safe_print(f"   {i}. {motivation}")
-            self.safe_print(f"      📌 Source: {source}")
+            lines.append(f"   {i}. {motivation}")
+            lines.append(f"      📌 Source: {source}")
         
         # Goals & Needs with emojis and better formatting
-        self.safe_print("\n\U0001f3af " + "GOALS & NEEDS".ljust(75, '\u2500'))
+        lines.append("\n\U0001f3af " + "GOALS & NEEDS".ljust(75, '\u2500'))
         for i, (goal, source) in enumerate(goals[:3], 1):
-            self.safe_print(f"   {i}. {goal}")
-            self.safe_print(f"      📌 Source: {source}")
+            lines.append(f"   {i}. {goal}")
+            lines.append(f"      📌 Source: {source}")
         
         # Behavior & Habits with emojis and better formatting
-        self.safe_print("\n\U0001f4dd " + "BEHAVIORS & HABITS".ljust(75, '\u2500'))
+        lines.append("\n\U0001f4dd " + "BEHAVIORS & HABITS".ljust(75, '\u2500'))
         for i, (behavior, source) in enumerate(behaviors[:3], 1):
-            self.safe_print(f"   {i}. {behavior}")
-            self.safe_print(f"      📌 Source: {source}")
+            lines.append(f"   {i}. {behavior}")
+            lines.append(f"      📌 Source: {source}")
         
         # Frustrations with emojis and better formatting
-        self.safe_print("\n\U0001f621 " + "FRUSTRATIONS".ljust(75, '\u2500'))
+        lines.append("\n\U0001f621 " + "FRUSTRATIONS".ljust(75, '\u2500'))
         for i, (frustration, source) in enumerate(frustrations[:3], 1):
-            self.safe_print(f"   {i}. {frustration}")
-            self.safe_print(f"      📌 Source: {source}")
+            lines.append(f"   {i}. {frustration}")
+            lines.append(f"      📌 Source: {source}")
         
         # Activity Summary with emojis and better formatting
-        self.safe_print("\n\U0001f4ca " + "ACTIVITY SUMMARY".ljust(75, '\u2500'))
-        self.safe_print(f"   📊 Activity Level: {activity_level}")
-        self.safe_print(f"   💬 Total Comments: {total_comments:,}")
-        self.safe_print(f"   📝 Total Posts: {total_posts:,}")
-        self.safe_print(f"   📅 Total Activity: {total_comments + total_posts:,} interactions")
+        lines.append("\n\U0001f4ca " + "ACTIVITY SUMMARY".ljust(75, '\u2500'))
+        lines.append(f"   📊 Activity Level: {activity_level}")
+        lines.append(f"   💬 Total Comments: {total_comments:,}")
+        lines.append(f"   📝 Total Posts: {total_posts:,}")
+        lines.append(f"   📅 Total Activity: {total_comments + total_posts:,} interactions")
         
         # Most active subreddits
         if comments or posts:
-            all_subs = [comment['subreddit'] for comment in comments] + \
-                      [post['subreddit'] for post in posts]
-            if all_subs:
-                common_subs = Counter(all_subs).most_common(5)
-                self.safe_print("\n🏆 " + "MOST ACTIVE COMMUNITIES".ljust(75, '─'))
+            sub_counts = Counter(chain((comment['subreddit'] for comment in comments),
+                                       (post['subreddit'] for post in posts)))
+            if sub_counts:
+                common_subs = sub_counts.most_common(5)  # top-n via heapq, no full sort
+                lines.append("\n🏆 " + "MOST ACTIVE COMMUNITIES".ljust(75, '─'))
+                top_count = common_subs[0][1]
                 for i, (sub, count) in enumerate(common_subs, 1):
-                    bar = '█' * min(10, int((count / common_subs[0][1]) * 10))
-                    self.safe_print(f"   {i}. r/{sub:<20} {bar} {count:,} interactions")
-                    
-                    # Add to persona data for export
-                    persona_data['top_subreddits'] = [{'subreddit': sub, 'count': count} for sub, count in common_subs]
+                    bar = '█' * min(10, int((count / top_count) * 10))
+                    lines.append(f"   {i}. r/{sub:<20} {bar} {count:,} interactions")
+                
+                # Add to persona data for export
+                persona_data['top_subreddits'] = [{'subreddit': sub, 'count': count} for sub, count in common_subs]
+        
+        # Write the whole summary with a single call
+        try:
+            sys.stdout.write("\n".join(lines) + "\n")
+        except UnicodeEncodeError:
+            # Fallback for environments with limited encoding support
+            sys.stdout.write("\n".join(lines).encode('ascii', 'replace').decode('ascii') + "\n")
         
         # Export to Google Sheets if requested
         if export_to_sheets and hasattr(self, 'google_sheets_service') and self.google_sheets_service:
@@ -937,172 +975,176 @@ class RedditPersonaAnalyzer:
 
 def export_to_excel(username, persona_data):
     """Export persona data to an Excel file with proper formatting"""
-    import pandas as pd
-    from datetime import datetime
-    import os
-    from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-    from openpyxl.utils import get_column_letter
-    
     try:
         # Create output directory if it doesn't exist
-        os.makedirs('exports', exist_ok=True)
+        out_dir = Path('exports')
+        out_dir.mkdir(exist_ok=True)
         
         # Create a filename with timestamp
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"reddit_persona_{username}_{timestamp}.xlsx"
-        filepath = os.path.abspath(os.path.join('exports', filename))
+        filepath = (out_dir / f"reddit_persona_{username}_{datetime.now():%Y%m%d_%H%M%S}.xlsx").resolve()
         
-        # Create a Pandas Excel writer using openpyxl
-        with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-            # Create a workbook and add a worksheet
-            workbook = writer.book
-            worksheet = workbook.create_sheet("Persona Analysis")
-            
-            # Define styles
-            header_font = Font(bold=True, color="FFFFFF")
-            header_fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
-            section_font = Font(bold=True, size=12, color="1F4E78")
-            border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
-            
-            # Start row counter
-            row = 1
-            
-            # Add title
-            title = f"Reddit Persona Analysis - u/{username}"
-            worksheet.append([title])
-            worksheet.merge_cells(f'A{row}:B{row}')
-            worksheet[f'A{row}'].font = Font(size=14, bold=True, color="1F4E78")
-            worksheet[f'A{row}'].alignment = Alignment(horizontal='center')
-            row += 2
-            
-            # Function to add a section
-            def add_section(title):
-                nonlocal row
-                worksheet.append([title])
-                worksheet.merge_cells(f'A{row}:B{row}')
-                worksheet[f'A{row}'].font = section_font
-                worksheet[f'A{row}'].fill = PatternFill(start_color="DCE6F1", end_color="DCE6F1", fill_type="solid")
-                row += 1
-            
-            # Function to add key-value pairs
-            def add_kv(key, value):
-                nonlocal row
-                worksheet.append([key, value])
-                worksheet[f'A{row}'].font = Font(bold=True)
-                worksheet[f'B{row}'].alignment = Alignment(wrap_text=True, vertical='top')
-                row += 1
-            
-            # Add basic information
-            add_section("🔹 BASIC INFORMATION")
-            add_kv("Username:", f"u/{username}")
-            add_kv("Age:", str(persona_data.get('age', 'N/A')))
-            add_kv("Location:", str(persona_data.get('location', 'N/A')))
-            add_kv("Occupation:", str(persona_data.get('occupation', 'N/A')))
-            add_kv("Relationship Status:", str(persona_data.get('marriage_status', 'N/A')))
-            row += 1  # Add empty row
-            
-            # Add personality section
-            add_section("🧠 PERSONALITY & ARCHETYPE")
-            add_kv("Archetype:", str(persona_data.get('archetype', 'N/A')))
-            add_kv("Personality:", str(persona_data.get('personality', 'N/A')))
-            row += 1
-            
-            # Add motivations
-            motivations = persona_data.get('motivations', [])
-            if motivations:
-                add_section("💡 MOTIVATIONS")
-                for i, (motivation, _) in enumerate(motivations, 1):
-                    add_kv(f"{i}.", str(motivation))
-                row += 1
-            
-            # Add goals
-            goals = persona_data.get('goals', [])
-            if goals:
-                add_section("🎯 GOALS & NEEDS")
-                for i, (goal, _) in enumerate(goals, 1):
-                    add_kv(f"{i}.", str(goal))
-                row += 1
-            
-            # Add behaviors
-            behaviors = persona_data.get('behaviors', [])
-            if behaviors:
-                add_section("📝 BEHAVIORS & HABITS")
-                for i, (behavior, _) in enumerate(behaviors, 1):
-                    add_kv(f"{i}.", str(behavior))
-                row += 1
-            
-            # Add frustrations
-            frustrations = persona_data.get('frustrations', [])
-            if frustrations:
-                add_section("😡 FRUSTRATIONS")
-                for i, (frustration, _) in enumerate(frustrations, 1):
-                    add_kv(f"{i}.", str(frustration))
-                row += 1
-            
-            # Add activity summary
-            add_section("📊 ACTIVITY SUMMARY")
-            add_kv("Activity Level:", str(persona_data.get('activity_level', 'N/A')))
-            add_kv("Total Comments:", str(persona_data.get('total_comments', 0)))
-            add_kv("Total Posts:", str(persona_data.get('total_posts', 0)))
-            
-            # Add top subreddits if available
-            if 'top_subreddits' in persona_data and persona_data['top_subreddits']:
-                add_section("🏆 TOP SUBREDDITS")
-                for i, sub in enumerate(persona_data['top_subreddits'], 1):
-                    if isinstance(sub, dict):
-                        sub_name = sub.get('subreddit', 'N/A')
-                        count = sub.get('count', 0)
-                        add_kv(f"{i}. r/{sub_name}", f"{count} interactions")
-                    else:
-                        add_kv(f"{i}.", f"r/{sub}")
-            
-            # Adjust column widths
-            for column_cells in worksheet.columns:
-                length = max(len(str(cell.value)) for cell in column_cells)
-                worksheet.column_dimensions[get_column_letter(column_cells[0].column)].width = min(length + 2, 50)
+        # Write-only mode streams rows straight to the file instead of building
+        # the full cell grid in memory. Column widths have to be set before the
+        # first row is written, so rows are collected first and written at the end.
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet("Persona Analysis")
+        
+        # Define styles
+        title_font = Font(size=14, bold=True, color="1F4E78")
+        title_alignment = Alignment(horizontal='center')
+        section_font = Font(bold=True, size=12, color="1F4E78")
+        section_fill = PatternFill(start_color="DCE6F1", end_color="DCE6F1", fill_type="solid")
+        key_font = Font(bold=True)
+        value_alignment = Alignment(wrap_text=True, vertical='top')
+        border = Border(
+            left=Side(style='thin'),
+            right=Side(style='thin'),
+            top=Side(style='thin'),
+            bottom=Side(style='thin')
+        )
+        
+        # Rows to write, as (kind, values), and the widest value seen in columns A and B
+        rows = []
+        col_widths = [0, 0]
+        
+        # Add title
+        title = f"Reddit Persona Analysis - u/{username}"
+        rows.append(('title', [title]))
+        col_widths[0] = len(title)
+        rows.append(('blank', []))
+        
+        # Function to add a section
+        def add_section(title):
+            rows.append(('section', [title]))
+            col_widths[0] = max(col_widths[0], len(title))
+        
+        # Function to add key-value pairs
+        def add_kv(key, value):
+            rows.append(('kv', [key, value]))
+            col_widths[0] = max(col_widths[0], len(key))
+            col_widths[1] = max(col_widths[1], len(value))
+        
+        # Function to add an empty row
+        def add_blank():
+            rows.append(('blank', []))
+        
+        # Add basic information
+        add_section("🔹 BASIC INFORMATION")
+        add_kv("Username:", f"u/{username}")
+        add_kv("Age:", str(persona_data.get('age', 'N/A')))
+        add_kv("Location:", str(persona_data.get('location', 'N/A')))
+        add_kv("Occupation:", str(persona_data.get('occupation', 'N/A')))
+        add_kv("Relationship Status:", str(persona_data.get('marriage_status', 'N/A')))
+        add_blank()
+        
+        # Add personality section
+        add_section("🧠 PERSONALITY & ARCHETYPE")
+        add_kv("Archetype:", str(persona_data.get('archetype', 'N/A')))
+        add_kv("Personality:", str(persona_data.get('personality', 'N/A')))
+        add_blank()
+        
+        # Add motivations
+        motivations = persona_data.get('motivations', [])
+        if motivations:
+            add_section("💡 MOTIVATIONS")
+            for i, (motivation, _) in enumerate(motivations, 1):
+                add_kv(f"{i}.", str(motivation))
+            add_blank()
+        
+        # Add goals
+        goals = persona_data.get('goals', [])
+        if goals:
+            add_section("🎯 GOALS & NEEDS")
+            for i, (goal, _) in enumerate(goals, 1):
+                add_kv(f"{i}.", str(goal))
+            add_blank()
+        
+        # Add behaviors
+        behaviors = persona_data.get('behaviors', [])
+        if behaviors:
+            add_section("📝 BEHAVIORS & HABITS")
+            for i, (behavior, _) in enumerate(behaviors, 1):
+                add_kv(f"{i}.", str(behavior))
+            add_blank()
+        
+        # Add frustrations
+        frustrations = persona_data.get('frustrations', [])
+        if frustrations:
+            add_section("😡 FRUSTRATIONS")
+            for i, (frustration, _) in enumerate(frustrations, 1):
+                add_kv(f"{i}.", str(frustration))
+            add_blank()
+        
+        # Add activity summary
+        add_section("📊 ACTIVITY SUMMARY")
+        add_kv("Activity Level:", str(persona_data.get('activity_level', 'N/A')))
+        add_kv("Total Comments:", str(persona_data.get('total_comments', 0)))
+        add_kv("Total Posts:", str(persona_data.get('total_posts', 0)))
+        
+        # Add top subreddits if available
+        if 'top_subreddits' in persona_data and persona_data['top_subreddits']:
+            add_section("🏆 TOP SUBREDDITS")
+            for i, sub in enumerate(persona_data['top_subreddits'], 1):
+                if isinstance(sub, dict):
+                    sub_name = sub.get('subreddit', 'N/A')
+                    count = sub.get('count', 0)
+                    add_kv(f"{i}. r/{sub_name}", f"{count} interactions")
+                else:
+                    add_kv(f"{i}.", f"r/{sub}")
+        
+        # Adjust column widths
+        worksheet.column_dimensions['A'].width = min(col_widths[0] + 2, 50)
+        worksheet.column_dimensions['B'].width = min(col_widths[1] + 2, 50)
+        
+        # Write the rows with their styles and borders attached to each cell
+        for row, (kind, values) in enumerate(rows, 1):
+            if kind == 'blank':
+                worksheet.append([])
+                continue
             
-            # Apply borders to all cells
-            for row_cells in worksheet.iter_rows():
-                for cell in row_cells:
-                    cell.border = border
+            cells = [WriteOnlyCell(worksheet, value=values[0]),
+                     WriteOnlyCell(worksheet, value=values[1] if len(values) > 1 else None)]
+            for cell in cells:
+                cell.border = border
             
-            # Remove the default sheet created by pandas
-            if 'Sheet' in workbook.sheetnames:
-                std = workbook['Sheet']
-                workbook.remove(std)
+            if kind == 'kv':
+                cells[0].font = key_font
+                cells[1].alignment = value_alignment
+            else:
+                worksheet.merged_cells.add(f'A{row}:B{row}')
+                if kind == 'title':
+                    cells[0].font = title_font
+                    cells[0].alignment = title_alignment
+                else:
+                    cells[0].font = section_font
+                    cells[0].fill = section_fill
             
-            # Save the workbook
-            workbook.save(filepath)
+            worksheet.append(cells)
         
-        # Verify the file was created
-        if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
-            print(f"\n✅ Excel file created successfully: {filepath}")
-            try:
-                # Try to open with default application
-                if os.name == 'nt':  # Windows
-                    os.startfile(filepath)
-                elif os.name == 'posix':  # macOS and Linux
-                    if sys.platform == 'darwin':
-                        os.system(f'open "{filepath}"')
-                    else:
-                        os.system(f'xdg-open "{filepath}"')
-            except Exception as e:
-                print(f"Note: Could not open file automatically: {e}")
-                print("Please open the file manually from the exports folder.")
-            return filepath
-        else:
-            raise Exception("Failed to create Excel file: File is empty or not created")
+        # Save the workbook
+        workbook.save(filepath)
+        
+        # save() raises if the file can't be written
+        print(f"\n✅ Excel file created successfully: {filepath}")
+        try:
+            # Try to open with default application
+            if os.name == 'nt':  # Windows
+                os.startfile(filepath)
+            elif os.name == 'posix':  # macOS and Linux
+                if sys.platform == 'darwin':
+                    os.system(f'open "{filepath}"')
+                else:
+                    os.system(f'xdg-open "{filepath}"')
+        except Exception as e:
+            print(f"Note: Could not open file automatically: {e}")
+            print("Please open the file manually from the exports folder.")
+        return str(filepath)
             
     except Exception as e:
         # Clean up if file creation failed
-        if 'filepath' in locals() and os.path.exists(filepath):
+        if 'filepath' in locals() and filepath.exists():
             try:
-                os.remove(filepath)
+                filepath.unlink()
             except:
                 pass
         print(f"Error exporting to text file: {e}")
@@ -1118,8 +1160,19 @@ def main():
     parser.add_argument('--export', action='store_true', help='Export to Google Sheets')
     parser.add_argument('--spreadsheet-id', help='Google Sheets spreadsheet ID (optional)')
     parser.add_argument('--excel', action='store_true', help='Export to Excel file (default if no export specified)')
+    parser.add_argument('--setup', action='store_true', help='Download required NLTK data into ./nltk_data and exit')
     args = parser.parse_args()
     
+    if args.setup:
+        print("Downloading required NLTK data...")
+        if setup_nltk(_BUNDLED_NLTK_DATA):
+            print(f"✅ NLTK data is available in {_BUNDLED_NLTK_DATA}")
+        else:
+            print("❌ Failed to download NLTK data. Check your network connection and try again.")
+        return
+    
+    _check_nltk_data()
+    
     # Load environment variables
     load_dotenv()
     
@@ -1138,9 +1191,8 @@ def main():
     print("======================\n")
     
     # Check if Google Sheets export is available
-    export_to_sheets = False
-    if hasattr(analyzer, 'google_sheets_service') and analyzer.google_sheets_service:
-        export_to_sheets = True
+    has_sheets = bool(getattr(analyzer, 'google_sheets_service', None))
+    if has_sheets:
         print("✅ Google Sheets export is available (credentials found)")
     else:
         print("ℹ️  Google Sheets export is not available. To enable:")
@@ -1149,6 +1201,13 @@ def main():
         print("   3. Save the JSON file as 'credentials.json' in this directory")
         print("   4. Or set GOOGLE_CREDENTIALS_PATH environment variable to the credentials file\n")
     
+    # A username given on the command line is analyzed once, unless a Google Sheets
+    # export was requested
+    cli_single_shot = bool(args.username) and not (args.export or args.spreadsheet_id)
+    
+    # User whose last export failed; entering them again retries the export
+    retry_export_for = None
+    
     try:
         while True:
             # Get input if not provided as argument
@@ -1165,27 +1224,36 @@ def main():
             
             print(f"\nAnalyzing: {user_input}")
             
-            # Analyze the user and get persona data
-            persona_data = analyzer.analyze_user(user_input, export_to_sheets=False)
+            # Analyze the user and get persona data. Retrying a failed export reuses
+            # the last analysis instead of fetching and scanning everything again;
+            # any other input is analyzed fresh.
+            username = analyzer.extract_username(user_input)
+            persona_data = analyzer.get_last_persona(username) if username == retry_export_for else None
+            retry_export_for = None
+            if persona_data:
+                print(f"Retrying the export with the previous analysis of u/{username}")
+            else:
+                persona_data = analyzer.analyze_user(user_input, export_to_sheets=False)
             
             if not persona_data:
                 print("No data to export.")
                 continue
                 
             # Handle exports if requested
-            if args.excel or (export_to_sheets and not args.excel) or not (args.excel or export_to_sheets):
+            if args.excel or (has_sheets and not args.excel) or not (args.excel or has_sheets):
                 try:
                     excel_file = export_to_excel(user_input, persona_data)
-                    print(f"\n Data exported to Excel: {os.path.abspath(excel_file)}")
+                    print(f"\n Data exported to Excel: {excel_file}")
                 except Exception as e:
                     print(f"\n Error exporting to Excel: {str(e)}")
+                    retry_export_for = username
             
             if args.export or args.spreadsheet_id:
                 print("\n" + "="*50)
                 print("EXPORT OPTIONS")
                 print("="*50)
                 
-                if args.spreadsheet_id or (hasattr(analyzer, 'google_sheets_service') and analyzer.google_sheets_service):
+                if args.spreadsheet_id or has_sheets:
                     print("\nExporting to Google Sheets...")
                     if args.spreadsheet_id:
                         sheet_url = analyzer.export_to_google_sheets(user_input, persona_data, args.spreadsheet_id)
@@ -1196,11 +1264,15 @@ def main():
                         print(f"✅ Data exported to Google Sheets: {sheet_url}")
                     else:
                         print("❌ Failed to export to Google Sheets.")
+                        retry_export_for = username
                 else:
                     print("Google Sheets export not available.")
             
+            if retry_export_for and not cli_single_shot:
+                print(f"Enter u/{username} again to retry the export without re-fetching.")
+            
             # Exit if username was provided as command line argument
-            if len(sys.argv) > 1 and not any(opt in sys.argv[1:] for opt in ['--export', '--spreadsheet-id']):
+            if cli_single_shot:
                 break
                 
     except KeyboardInterrupt: